@@ -5,14 +5,14 @@ FastAPI backend for analyzing music and extracting chord progressions
 
 from fastapi import FastAPI, HTTPException, Request, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 import os
 import json
+import asyncio
 import base64
-import subprocess
 from datetime import datetime
 from dotenv import load_dotenv
 import anthropic
@@ -26,16 +26,16 @@ from models.schemas import (
     DeconstructRequest,
     DeconstructResponse,
     SimpleChord,
-    DeconstructStep,
     SuggestRequest,
     SuggestResponse,
     SuggestionData,
     ChordInsightRequest,
     ChordInsightResponse,
 )
-from services.deconstructor import ProgressionDeconstructor
+from services.deconstructor import JSON_OBJECT_RE, ProgressionDeconstructor
 from services.emotional_mapper import EmotionalMapper
 from services.omr_service import OMRService, OMRError
+from services.llm_cache import LLMCache
 
 # Load environment variables
 load_dotenv()
@@ -107,6 +107,12 @@ async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
 progression_deconstructor = ProgressionDeconstructor()
 emotional_mapper = EmotionalMapper()
 omr_service = OMRService()
+llm_cache = LLMCache()
+# One long-lived async client for suggestion explanations, so connections are reused
+suggestion_client = (
+    anthropic.AsyncAnthropic(api_key=os.getenv("CLAUDE_API_KEY"))
+    if os.getenv("CLAUDE_API_KEY") else None
+)
 
 
 @app.on_event("startup")
@@ -173,8 +179,6 @@ async def analyze_pdf(request: Request, file: UploadFile = File(...)):
         }
     except OMRError as e:
         return {"success": False, "error": str(e)}
-    except subprocess.TimeoutExpired:
-        return {"success": False, "error": "PDF processing timed out (max 2 minutes). Try a smaller or simpler PDF."}
     except Exception as e:
         return {"success": False, "error": f"PDF analysis failed: {str(e)}"}
 
@@ -384,7 +388,7 @@ async def explain_chord(request: Request, body: ExplainRequest):
         )
 
 
-@app.post("/api/deconstruct", response_model=DeconstructResponse)
+@app.post("/api/deconstruct", response_model=DeconstructResponse, response_class=ORJSONResponse)
 @limiter.limit("20/hour")
 async def deconstruct_progression(request: Request, body: DeconstructRequest):
     """
@@ -418,49 +422,20 @@ async def deconstruct_progression(request: Request, body: DeconstructRequest):
     }
     """
     try:
-        # Convert SimpleChord objects to dictionaries for the deconstructor
-        chord_dicts = [
-            {
-                "root": chord.root,
-                "quality": chord.quality,
-                "extensions": chord.extensions or {}
-            }
-            for chord in body.chords
-        ]
-
         # Perform deconstruction with optional song context
         steps_data = await progression_deconstructor.deconstruct(
-            chord_dicts,
+            deconstruct_chord_dicts(body),
             body.key,
             body.mode,
             song_title=body.songTitle,
             composer=body.composer
         )
 
-        # Convert to DeconstructStep objects
-        steps = [
-            DeconstructStep(
-                stepNumber=step["stepNumber"],
-                stepName=step["stepName"],
-                description=step["description"],
-                chords=[
-                    SimpleChord(
-                        root=c["root"],
-                        quality=c["quality"],
-                        extensions=c.get("extensions")
-                    )
-                    for c in step["chords"]
-                ],
-                layerType=step.get("layerType"),
-                modifiedIndices=step.get("modifiedIndices"),
-                romanNumerals=step.get("romanNumerals"),
-            )
-            for step in steps_data
-        ]
-
+        # Step dicts already match the DeconstructStep shape; let pydantic
+        # validate them directly instead of rebuilding each model by hand
         return DeconstructResponse(
             success=True,
-            steps=steps
+            steps=steps_data
         )
 
     except Exception as e:
@@ -470,6 +445,68 @@ async def deconstruct_progression(request: Request, body: DeconstructRequest):
         )
 
 
+@app.post("/api/deconstruct/stream")
+@limiter.limit("20/hour")
+async def deconstruct_progression_stream(request: Request, body: DeconstructRequest):
+    """
+    Same as /api/deconstruct, but streamed as Server-Sent Events.
+
+    Each step is sent as soon as its description is ready, so the first steps
+    can be shown while Claude is still explaining the later ones.
+
+    Events:
+      event: step   data: {"stepNumber": 0, "stepName": "Skeleton", ...}  (one per step, in order)
+      event: error  data: {"error": "Deconstruction failed: ..."}
+      event: done   data: {}
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def run_deconstruction():
+        try:
+            await progression_deconstructor.deconstruct(
+                deconstruct_chord_dicts(body),
+                body.key,
+                body.mode,
+                song_title=body.songTitle,
+                composer=body.composer,
+                on_step=queue.put
+            )
+            await queue.put(None)
+        except Exception as e:
+            await queue.put(e)
+
+    async def events():
+        task = asyncio.create_task(run_deconstruction())
+        try:
+            while (item := await queue.get()) is not None:
+                if isinstance(item, Exception):
+                    yield f"event: error\ndata: {json.dumps({'error': f'Deconstruction failed: {str(item)}'})}\n\n"
+                    return
+                yield f"event: step\ndata: {json.dumps(item)}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        finally:
+            # Stop generating if the client disconnects mid-stream
+            task.cancel()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def deconstruct_chord_dicts(body: DeconstructRequest) -> List[dict]:
+    """Convert SimpleChord objects to dictionaries for the deconstructor"""
+    return [
+        {
+            "root": chord.root,
+            "quality": chord.quality,
+            "extensions": chord.extensions or {}
+        }
+        for chord in body.chords
+    ]
+
+
 # Chord manipulation functions for suggestions
 
 def apply_technique(chord: SimpleChord, technique: str) -> SimpleChord:
@@ -528,7 +565,16 @@ def apply_technique(chord: SimpleChord, technique: str) -> SimpleChord:
     )
 
 
-async def build_suggestion_explanation(
+SUGGESTION_PROMPT_INTRO = "You're helping a composer find exactly the sound they're after. Think Leonard Bernstein explaining to both a concert hall and a living room—warm, wise, never condescending."
+
+SUGGESTION_GUIDANCE = """- What this change DOES to the sound (not just what it IS)
+- Why it delivers the feeling they're after
+- If a composer like Lauridsen or Whitacre uses this trick, say so—but tell us WHY it works for them
+
+Be vivid but not flowery. A touch of wit is fine. No jargon without explaining it. No markdown."""
+
+
+def build_suggestion_prompt(
     from_chord: SimpleChord,
     to_chord: SimpleChord,
     technique: str,
@@ -537,57 +583,141 @@ async def build_suggestion_explanation(
     key: str,
     mode: str
 ) -> str:
+    """Build the Claude prompt explaining a single chord suggestion."""
+    return f"""{SUGGESTION_PROMPT_INTRO}
+
+The composer wants: "{intent}"
+
+We're suggesting: {from_chord.root} {from_chord.quality} → {to_chord.root} {to_chord.quality}
+Technique: {technique}
+Key: {key} {mode}
+Think of: {', '.join(composers)}
+
+In 1-2 sentences, explain:
+{SUGGESTION_GUIDANCE}"""
+
+
+async def build_suggestion_explanations(
+    candidates: List[tuple],
+    intent: str,
+    composers: List[str],
+    key: str,
+    mode: str
+) -> List[str]:
     """
-    Build an AI explanation for a chord suggestion.
+    Build AI explanations for several chord suggestions with one Claude call.
+
+    Suggestions explained before are answered from the cache. The rest are
+    explained together in a single request that returns a JSON object keyed by
+    suggestion index; each answer is cached as if it had been asked on its own.
+    Suggestions missing from the response fall back to a static explanation.
 
     Args:
-        from_chord: Original chord
-        to_chord: Modified chord
-        technique: Applied technique
+        candidates: (chord index, from chord, technique, to chord) tuples
         intent: User's emotional intent
         composers: Relevant composers
         key: Musical key
         mode: Major or minor
 
     Returns:
-        AI-generated explanation
+        One explanation per candidate, in order
     """
-    api_key = os.getenv("CLAUDE_API_KEY")
-
-    if not api_key:
-        return "The added extension creates a harmonic shift. Listen carefully to the sound difference."
+    if suggestion_client is None:
+        return [
+            "The added extension creates a harmonic shift. Listen carefully to the sound difference."
+            for _ in candidates
+        ]
 
-    prompt = f"""You're helping a composer find exactly the sound they're after. Think Leonard Bernstein explaining to both a concert hall and a living room—warm, wise, never condescending.
+    cache_keys = [
+        llm_cache.make_key(
+            build_suggestion_prompt(chord, modified_chord, technique, intent, composers, key, mode),
+            CLAUDE_MODEL,
+            256
+        )
+        for _, chord, technique, modified_chord in candidates
+    ]
+    explanations = [await llm_cache.get(cache_key) for cache_key in cache_keys]
+    pending = [i for i, explanation in enumerate(explanations) if explanation is None]
+
+    if len(pending) == 1:
+        i = pending[0]
+        _, chord, technique, modified_chord = candidates[i]
+        try:
+            message = await suggestion_client.messages.create(
+                model=CLAUDE_MODEL,
+                max_tokens=256,
+                messages=[{
+                    "role": "user",
+                    "content": build_suggestion_prompt(
+                        chord, modified_chord, technique, intent, composers, key, mode
+                    )
+                }]
+            )
+            explanation = message.content[0].text.strip() if message.content else ""
+        except Exception as e:
+            print(f"Error generating explanation: {str(e)}")
+            explanation = ""
+
+        if explanation:
+            explanations[i] = explanation
+            await llm_cache.set(cache_keys[i], explanation)
+        else:
+            explanations[i] = suggestion_fallback_explanation(technique)
+    elif pending:
+        sections = []
+        for i in pending:
+            _, chord, technique, modified_chord = candidates[i]
+            sections.append(
+                f'<suggestion id="{i}">\n'
+                f"We're suggesting: {chord.root} {chord.quality} → {modified_chord.root} {modified_chord.quality}\n"
+                f"Technique: {technique}\n"
+                "</suggestion>"
+            )
+        suggestion_sections = "\n\n".join(sections)
+        example = ", ".join(f'"{i}": "..."' for i in pending)
+        prompt = f"""{SUGGESTION_PROMPT_INTRO}
 
 The composer wants: "{intent}"
 
-We're suggesting: {from_chord.root} {from_chord.quality} → {to_chord.root} {to_chord.quality}
-Technique: {technique}
 Key: {key} {mode}
 Think of: {', '.join(composers)}
 
-In 1-2 sentences, explain:
-- What this change DOES to the sound (not just what it IS)
-- Why it delivers the feeling they're after
-- If a composer like Lauridsen or Whitacre uses this trick, say so—but tell us WHY it works for them
+{suggestion_sections}
 
-Be vivid but not flowery. A touch of wit is fine. No jargon without explaining it. No markdown."""
+For each suggestion, in 1-2 sentences, explain:
+{SUGGESTION_GUIDANCE}
 
-    try:
-        client = anthropic.Anthropic(api_key=api_key)
-        message = client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=256,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
+Return only a JSON object mapping each suggestion id to its explanation: {{{example}}}"""
 
-        return message.content[0].text if message.content else ""
+        try:
+            message = await suggestion_client.messages.create(
+                model=CLAUDE_MODEL,
+                max_tokens=256 * len(pending),
+                messages=[{"role": "user", "content": prompt}]
+            )
+            response_text = message.content[0].text if message.content else ""
+            json_match = JSON_OBJECT_RE.search(response_text)
+            batch = json.loads(json_match.group()) if json_match else {}
+            if not isinstance(batch, dict):
+                batch = {}
+        except Exception as e:
+            print(f"Error generating explanations: {str(e)}")
+            batch = {}
 
-    except Exception as e:
-        print(f"Error generating explanation: {str(e)}")
-        return f"The {technique} creates a harmonic shift characteristic of modern composition techniques."
+        for i in pending:
+            explanation = batch.get(str(i))
+            if isinstance(explanation, str) and explanation.strip():
+                explanations[i] = explanation.strip()
+                await llm_cache.set(cache_keys[i], explanations[i])
+            else:
+                explanations[i] = suggestion_fallback_explanation(candidates[i][2])
+
+    return explanations
+
+
+def suggestion_fallback_explanation(technique: str) -> str:
+    """Static explanation used when Claude can't explain a suggestion."""
+    return f"The {technique} creates a harmonic shift characteristic of modern composition techniques."
 
 
 def calculate_relevance_score(technique: str, intent: str, avoid_list: List[str]) -> float:
@@ -665,46 +795,42 @@ async def suggest_refinements(request: Request, body: SuggestRequest):
                 suggestions=[]
             )
 
-        suggestions = []
-        suggestion_id = 0
-
-        # Generate suggestions for each chord and technique combination
+        # Collect every chord/technique combination first, skipping ones that
+        # wouldn't change the chord (already present, or not an extension
+        # apply_technique knows) so no Claude call is spent on them
+        candidates = []
         for chord_idx, chord in enumerate(body.chords):
             for technique in techniques[:3]:  # Limit to 3 techniques per chord
-                if suggestion_id >= 6:  # Overall limit to 6 suggestions
+                if len(candidates) >= 6:  # Overall limit to 6 suggestions
                     break
-
-                # Apply technique to create modified chord
                 modified_chord = apply_technique(chord, technique)
+                if modified_chord.extensions == (chord.extensions or {}):
+                    continue
+                candidates.append((chord_idx, chord, technique, modified_chord))
+
+        # Generate AI explanations for all candidates in one request
+        explanations = await build_suggestion_explanations(
+            candidates,
+            intent=body.intent,
+            composers=composers,
+            key=body.key,
+            mode=body.mode
+        )
 
-                # Calculate relevance
-                relevance = calculate_relevance_score(technique, body.intent, avoid)
-
-                # Generate AI explanation
-                explanation = await build_suggestion_explanation(
-                    from_chord=chord,
-                    to_chord=modified_chord,
-                    technique=technique,
-                    intent=body.intent,
-                    composers=composers,
-                    key=body.key,
-                    mode=body.mode
-                )
-
-                # Create suggestion
-                suggestion = SuggestionData(
-                    id=f"suggestion-{suggestion_id}",
-                    technique=technique,
-                    targetChordId=f"chord-{chord_idx}",
-                    fromChord=chord,
-                    toChord=modified_chord,
-                    rationale=explanation,
-                    examples=composers[:2] if composers else ["Various composers"],
-                    relevanceScore=relevance
-                )
-
-                suggestions.append(suggestion)
-                suggestion_id += 1
+        suggestions = []
+        for suggestion_id, ((chord_idx, chord, technique, modified_chord), explanation) in enumerate(
+            zip(candidates, explanations)
+        ):
+            suggestions.append(SuggestionData(
+                id=f"suggestion-{suggestion_id}",
+                technique=technique,
+                targetChordId=f"chord-{chord_idx}",
+                fromChord=chord,
+                toChord=modified_chord,
+                rationale=explanation,
+                examples=composers[:2] if composers else ["Various composers"],
+                relevanceScore=calculate_relevance_score(technique, body.intent, avoid)
+            ))
 
         # Sort by relevance score (highest first)
         suggestions.sort(key=lambda x: x.relevanceScore, reverse=True)
@@ -845,8 +971,7 @@ async def get_chord_insight(request: Request, body: ChordInsightRequest):
         response_text = message.content[0].text.strip()
 
         # Parse JSON response
-        import re
-        json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+        json_match = JSON_OBJECT_RE.search(response_text)
         if not json_match:
             return ChordInsightResponse(
                 success=False,
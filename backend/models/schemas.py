@@ -2,7 +2,7 @@
 Pydantic models for API request/response validation
 """
 
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, Field
 from typing import Optional, List, Dict
 
 
@@ -82,9 +82,13 @@ class ChordVoices(BaseModel):
 
 
 class ExplainChordData(BaseModel):
-    """Chord data for explanation request"""
+    """Chord data for explanation request
+
+    Accepts both ``scaleDegree`` and ``scale_degree`` so callers using either
+    naming convention are normalized once here instead of in every handler.
+    """
     id: str
-    scaleDegree: int
+    scaleDegree: int = Field(validation_alias=AliasChoices("scaleDegree", "scale_degree"))
     quality: str
     key: str
     mode: str
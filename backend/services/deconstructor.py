@@ -10,8 +10,20 @@ Produces a pedagogical step-by-step breakdown:
 5. FULL - Original progression with all modifications
 """
 import anthropic
+import asyncio
+import collections
+import functools
+import hashlib
+import json
 import os
-from typing import List, Dict, Optional, Tuple
+import re
+import statistics
+import time
+from typing import Awaitable, Callable, List, Dict, Optional, Tuple, TypeVar, Union
+
+from services.file_cache import FileCache, default_cache_path
+
+T = TypeVar("T")
 
 
 # Layer effect descriptions - what each harmonic layer adds emotionally/sonically
@@ -43,96 +55,247 @@ LAYER_EFFECTS = {
     },
 }
 
+# Static per-layer description, used as the explanation when Claude is unavailable
+FALLBACK_BY_LAYER = {layer_type: info["effect"] for layer_type, info in LAYER_EFFECTS.items()}
+
+CLAUDE_MODEL = "claude-sonnet-4-20250514"  # Use Sonnet for speed
+
+# Finished deconstructions are cached on disk (as JSON, one file per input).
+# Bump DECONSTRUCTION_CACHE_VERSION when prompts or step building change, to
+# stop serving stale entries.
+DECONSTRUCTION_CACHE_VERSION = 1
+# Least recently used deconstructions are dropped past this total size
+DECONSTRUCTION_CACHE_MAX_BYTES = 100 * 1024 * 1024  # 100 MB
+
+# Maximum number of Claude explanations kept in memory per process
+EXPLANATION_CACHE_SIZE = 1024
+
+# Server-wide cap on deconstruction Claude calls in flight at once, shared by
+# all requests (each deconstruction makes at most one call). It only guards
+# the Anthropic rate limit, so set it to what the account allows.
+MAX_CONCURRENT_EXPLANATIONS = int(os.getenv("MAX_CONCURRENT_EXPLANATIONS") or 16)
+
+# Give up on a Claude explanation call (and use the fallback) after it has run
+# this many seconds, not counting time spent waiting for a concurrency slot
+EXPLANATION_TIMEOUT = 30.0
+# Give up waiting for a concurrency slot after this many seconds
+EXPLANATION_QUEUE_TIMEOUT = 30.0
+# A call with no text yet after twice the recent median time-to-first-text gets
+# a duplicate request; whichever succeeds first wins. Until enough calls have
+# been timed, hedge after this many seconds without text.
+EXPLANATION_HEDGE_AFTER = 10.0
+# Number of recent time-to-first-text samples (per call kind) the median is taken over
+EXPLANATION_LATENCY_WINDOW = 50
+
+# Explanations are 2-3 sentences; stop streaming once this many are complete
+MAX_EXPLANATION_SENTENCES = 3
+# A sentence is complete once the next one visibly starts (skips "e.g. the")
+SENTENCE_END_RE = re.compile(r'[.!?]["\')\]]*(?=\s+["\'(]?[A-Z])')
+# Outermost JSON object in a batched explanation response
+JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+# One complete "id": "explanation" entry of that object, matched while it streams in
+BATCH_ENTRY_RE = re.compile(r'"(\d+)"\s*:\s*("(?:[^"\\]|\\.)*")')
+
+# What every explanation should cover, shared by single and batched prompts
+EXPLANATION_GUIDANCE = """- What this change DOES to the sound (be vivid—"floating", "aching", "bright")
+- WHY a composer reaches for this tool at this moment
+- How it serves the emotional arc
+
+RULES:
+- Talk about what the ear hears, not just what the theory says
+- If it affects how the voices move, mention it—but explain why that matters
+- Wit is welcome; sentimentality is not
+- No emojis, no exclamation points, no filler
+- Exactly 2-3 sentences"""
+
 # Roman numeral mappings
 SCALE_DEGREES_MAJOR = {0: 'I', 2: 'ii', 4: 'iii', 5: 'IV', 7: 'V', 9: 'vi', 11: 'vii°'}
 SCALE_DEGREES_MINOR = {0: 'i', 2: 'ii°', 3: 'III', 5: 'iv', 7: 'V', 8: 'VI', 10: 'VII'}
+
+
+def _numeral_table(scale_degrees: Dict[int, str], quality: Optional[str]) -> Tuple[str, ...]:
+    """Numerals for all 12 intervals above the key, with case adjusted to the chord quality"""
+    numerals = []
+    for interval in range(12):
+        numeral = scale_degrees.get(interval, '?')
+        if quality == 'minor' and numeral.isupper():
+            numeral = numeral.lower()
+        elif quality == 'major' and numeral.islower():
+            numeral = numeral.upper()
+        numerals.append(numeral)
+    return tuple(numerals)
+
+
+# (mode is major, quality) -> numeral per interval; quality None leaves case as in the scale
+ROMAN_NUMERAL_TABLES = {
+    (is_major, quality): _numeral_table(SCALE_DEGREES_MAJOR if is_major else SCALE_DEGREES_MINOR, quality)
+    for is_major in (True, False)
+    for quality in ('major', 'minor', None)
+}
+
 NOTE_TO_SEMITONE = {'C': 0, 'C#': 1, 'Db': 1, 'D': 2, 'D#': 3, 'Eb': 3, 'E': 4, 'F': 5,
                     'F#': 6, 'Gb': 6, 'G': 7, 'G#': 8, 'Ab': 8, 'A': 9, 'A#': 10, 'Bb': 10, 'B': 11}
 
 
+# Extension flags, one bit each
+EXT_MAJ7 = 1 << 0
+EXT_MIN7 = 1 << 1
+EXT_DOM7 = 1 << 2
+EXT_DIM7 = 1 << 3
+EXT_SUS2 = 1 << 4
+EXT_SUS4 = 1 << 5
+EXT_ADD9 = 1 << 6
+EXT_ADD11 = 1 << 7
+EXT_ADD13 = 1 << 8
+EXT_ADD6 = 1 << 9
+EXT_B5 = 1 << 10
+EXT_SHARP5 = 1 << 11
+EXT_B9 = 1 << 12
+EXT_SHARP9 = 1 << 13
+EXT_SHARP11 = 1 << 14
+EXT_B13 = 1 << 15
+
+# API extension names -> bits (also the order used when expanding to_dict)
+EXTENSION_BITS = {
+    'maj7': EXT_MAJ7, 'min7': EXT_MIN7, 'dom7': EXT_DOM7, 'dim7': EXT_DIM7,
+    'sus2': EXT_SUS2, 'sus4': EXT_SUS4,
+    'add9': EXT_ADD9, 'add11': EXT_ADD11, 'add13': EXT_ADD13, 'add6': EXT_ADD6,
+    'b5': EXT_B5, '#5': EXT_SHARP5, 'b9': EXT_B9, '#9': EXT_SHARP9, '#11': EXT_SHARP11, 'b13': EXT_B13,
+}
+
+# Extension flag groups, one per harmonic layer.
+# Only the first 7th (lowest bit: maj7, min7, dom7, dim7) is carried into a layer.
+SEVENTH_MASK = EXT_MAJ7 | EXT_MIN7 | EXT_DOM7 | EXT_DIM7
+SUSPENSION_MASK = EXT_SUS2 | EXT_SUS4
+EXTENSION_MASK = EXT_ADD9 | EXT_ADD11 | EXT_ADD13 | EXT_ADD6
+ALTERATION_MASK = EXT_B5 | EXT_SHARP5 | EXT_B9 | EXT_SHARP9 | EXT_SHARP11 | EXT_B13
+
+# Extension flags that place a chord in each layer
+LAYER_MASKS = {
+    "sevenths": SEVENTH_MASK,        # maj7, min7, dom7, dim7
+    "suspensions": SUSPENSION_MASK,  # sus2, sus4
+    "extensions": EXTENSION_MASK,    # add9, add11, add13, add6
+    "alterations": ALTERATION_MASK,  # b5, #5, b9, #9, #11, b13
+}
+
+
+# Flags that show up in chord symbols and roman numerals
+SYMBOL_MASK = SEVENTH_MASK | SUSPENSION_MASK | EXT_ADD9 | EXT_ADD11 | EXT_ADD13
+
+
+# Suffixes depend only on (quality, SYMBOL_MASK bits), so each combination is
+# built once and then looked up. Quality comes from requests, so keep the caches bounded.
+@functools.lru_cache(maxsize=1024)
+def _symbol_suffix(q: str, ext: int) -> str:
+    """Chord symbol suffix for a quality and SYMBOL_MASK bits"""
+    suffix = ""
+    if q == 'minor':
+        suffix = 'm'
+    elif q == 'diminished':
+        suffix = 'dim'
+    elif q == 'augmented':
+        suffix = '+'
+
+    # Add extensions to symbol
+    if ext & SEVENTH_MASK:
+        if ext & EXT_MAJ7:
+            suffix += 'maj7'
+        elif ext & EXT_MIN7:
+            suffix += '7' if q == 'minor' else 'm7'
+        elif ext & EXT_DOM7:
+            suffix += '7'
+        elif ext & EXT_DIM7:
+            suffix += 'dim7'
+
+    if ext & EXT_SUS4:
+        suffix = suffix.replace('7', '7sus4') if '7' in suffix else 'sus4'
+    if ext & EXT_SUS2:
+        suffix = suffix.replace('7', '7sus2') if '7' in suffix else 'sus2'
+
+    if ext & EXT_ADD9:
+        suffix = suffix.replace('7', '9') if '7' in suffix else suffix + 'add9'
+    if ext & EXT_ADD11:
+        suffix = suffix.replace('9', '11') if '9' in suffix else suffix + 'add11'
+    if ext & EXT_ADD13:
+        suffix = suffix.replace('11', '13') if '11' in suffix else suffix + 'add13'
+
+    return suffix
+
+
+@functools.lru_cache(maxsize=1024)
+def _roman_suffix(q: str, ext: int) -> str:
+    """Roman numeral suffix for a quality and SYMBOL_MASK bits"""
+    suffix = ""
+
+    # Add 7th indicator
+    if ext & SEVENTH_MASK:
+        if ext & EXT_MAJ7:
+            suffix += 'maj7'
+        elif ext & EXT_DOM7:
+            suffix += '7'
+        elif ext & EXT_MIN7:
+            suffix += '7' if q == 'minor' else 'm7'
+
+    # Add suspension indicator
+    if ext & EXT_SUS4:
+        suffix += 'sus4'
+    elif ext & EXT_SUS2:
+        suffix += 'sus2'
+
+    # Add extension indicators
+    if ext & EXT_ADD9:
+        suffix = suffix.replace('7', '9') if '7' in suffix else suffix + 'add9'
+    if ext & EXT_ADD11:
+        suffix = suffix.replace('9', '11') if '9' in suffix else suffix + '11'
+    if ext & EXT_ADD13:
+        suffix = suffix.replace('11', '13') if '11' in suffix else suffix + '13'
+
+    return suffix
+
+
 class Chord:
-    """Internal chord representation for deconstruction"""
+    """Internal chord representation for deconstruction
 
-    def __init__(self, root: str, quality: str, extensions: Optional[Dict[str, bool]] = None,
+    Extensions are stored as an int bitmask of EXT_* flags; to_dict()
+    expands them back to the API's {name: True} shape. Flags outside
+    EXTENSION_BITS play no part in deconstruction and are dropped. The
+    display symbol is built lazily once and reused.
+    """
+
+    __slots__ = ('root', 'quality', 'extensions', 'original_symbol', '_symbol')
+
+    def __init__(self, root: str, quality: str,
+                 extensions: Optional[Union[Dict[str, bool], int]] = None,
                  original_symbol: str = None):
         self.root = root
         self.quality = quality
-        self.extensions = extensions or {}
+        if isinstance(extensions, int):
+            self.extensions = extensions
+        else:
+            self.extensions = 0
+            for name, enabled in (extensions or {}).items():
+                if enabled:
+                    self.extensions |= EXTENSION_BITS.get(name, 0)
         self.original_symbol = original_symbol  # Preserve original for display
+        self._symbol = None  # Cached result of to_symbol()
 
     def to_dict(self):
         """Convert to dictionary format for API responses"""
         return {
             "root": self.root,
             "quality": self.quality,
-            "extensions": self.extensions,
+            "extensions": {name: True for name, bit in EXTENSION_BITS.items() if self.extensions & bit},
         }
 
-    def copy(self):
-        """Create a copy of this chord"""
-        return Chord(self.root, self.quality, dict(self.extensions), self.original_symbol)
-
-    def has_extension(self, extension: str) -> bool:
-        """Check if chord has a specific extension"""
-        return self.extensions.get(extension, False)
-
-    def has_any_seventh(self) -> bool:
-        """Check if chord has any type of 7th"""
-        return any(self.extensions.get(k, False) for k in ['maj7', 'min7', 'dom7', 'dim7'])
-
-    def has_any_suspension(self) -> bool:
-        """Check if chord has sus2 or sus4"""
-        return self.extensions.get('sus2', False) or self.extensions.get('sus4', False)
-
-    def has_any_extension(self) -> bool:
-        """Check if chord has 9th, 11th, or 13th"""
-        return any(self.extensions.get(k, False) for k in ['add9', 'add11', 'add13', 'add6'])
-
-    def has_any_alteration(self) -> bool:
-        """Check if chord has alterations like b5, #5, b9, etc."""
-        alteration_keys = ['b5', '#5', 'b9', '#9', '#11', 'b13']
-        return any(self.extensions.get(k, False) for k in alteration_keys)
-
-    def remove_extensions(self):
-        """Remove all extensions, keeping only root and base quality (triad)"""
-        # Keep the base triad quality
-        self.extensions = {}
-
     def to_symbol(self) -> str:
-        """Generate a readable chord symbol"""
-        suffix = ""
-        q = self.quality
-        if q == 'minor':
-            suffix = 'm'
-        elif q == 'diminished':
-            suffix = 'dim'
-        elif q == 'augmented':
-            suffix = '+'
-
-        # Add extensions to symbol
-        if self.has_any_seventh():
-            if self.extensions.get('maj7'):
-                suffix += 'maj7'
-            elif self.extensions.get('min7'):
-                suffix += '7' if q == 'minor' else 'm7'
-            elif self.extensions.get('dom7'):
-                suffix += '7'
-            elif self.extensions.get('dim7'):
-                suffix += 'dim7'
-
-        if self.extensions.get('sus4'):
-            suffix = suffix.replace('7', '7sus4') if '7' in suffix else 'sus4'
-        if self.extensions.get('sus2'):
-            suffix = suffix.replace('7', '7sus2') if '7' in suffix else 'sus2'
-
-        if self.extensions.get('add9'):
-            suffix = suffix.replace('7', '9') if '7' in suffix else suffix + 'add9'
-        if self.extensions.get('add11'):
-            suffix = suffix.replace('9', '11') if '9' in suffix else suffix + 'add11'
-        if self.extensions.get('add13'):
-            suffix = suffix.replace('11', '13') if '11' in suffix else suffix + 'add13'
-
-        return f"{self.root}{suffix}"
+        """Generate a readable chord symbol (cached after the first call)"""
+        if self._symbol is None:
+            self._symbol = self._build_symbol()
+        return self._symbol
+
+    def _build_symbol(self) -> str:
+        """Build the chord symbol from root, quality and extensions"""
+        return f"{self.root}{_symbol_suffix(self.quality, self.extensions & SYMBOL_MASK)}"
 
     def __repr__(self):
         return self.to_symbol()
@@ -143,142 +306,81 @@ class ProgressionDeconstructor:
 
     def __init__(self):
         self.api_key = os.getenv("CLAUDE_API_KEY")
-        self.client = anthropic.Anthropic(api_key=self.api_key) if self.api_key else None
-
-    def get_roman_numeral(self, chord: Chord, key: str, mode: str) -> str:
-        """Convert a chord to its Roman numeral in the given key"""
-        key_semitone = NOTE_TO_SEMITONE.get(key, 0)
-        root_semitone = NOTE_TO_SEMITONE.get(chord.root, 0)
-        interval = (root_semitone - key_semitone) % 12
-
-        scale_degrees = SCALE_DEGREES_MAJOR if mode == 'major' else SCALE_DEGREES_MINOR
-        base_numeral = scale_degrees.get(interval, '?')
-
-        # Adjust case based on chord quality
-        if chord.quality == 'minor' and base_numeral.isupper():
-            base_numeral = base_numeral.lower()
-        elif chord.quality == 'major' and base_numeral.islower():
-            base_numeral = base_numeral.upper()
-
-        # Add 7th indicator
-        if chord.has_any_seventh():
-            if chord.extensions.get('maj7'):
-                base_numeral += 'maj7'
-            elif chord.extensions.get('dom7'):
-                base_numeral += '7'
-            elif chord.extensions.get('min7'):
-                base_numeral += '7' if chord.quality == 'minor' else 'm7'
-
-        # Add suspension indicator
-        if chord.extensions.get('sus4'):
-            base_numeral += 'sus4'
-        elif chord.extensions.get('sus2'):
-            base_numeral += 'sus2'
-
-        # Add extension indicators
-        if chord.extensions.get('add9'):
-            base_numeral = base_numeral.replace('7', '9') if '7' in base_numeral else base_numeral + 'add9'
-        if chord.extensions.get('add11'):
-            base_numeral = base_numeral.replace('9', '11') if '9' in base_numeral else base_numeral + '11'
-        if chord.extensions.get('add13'):
-            base_numeral = base_numeral.replace('11', '13') if '11' in base_numeral else base_numeral + '13'
-
-        return base_numeral
-
-    def format_roman_numerals(self, chords: List[Chord], key: str, mode: str) -> str:
-        """Format progression as Roman numerals"""
-        numerals = [self.get_roman_numeral(c, key, mode) for c in chords]
-        return " → ".join(numerals)
+        # The SDK retries connection errors, 429s and 5xxs with exponential backoff
+        # (max_retries=2, i.e. up to 3 attempts per call)
+        self.client = anthropic.AsyncAnthropic(api_key=self.api_key, max_retries=2) if self.api_key else None
+        self._explanation_slots = asyncio.Semaphore(MAX_CONCURRENT_EXPLANATIONS)
+        # Recent Claude time-to-first-text in seconds, per call kind ("single" / "batch")
+        self._first_text_times: Dict[str, collections.deque] = collections.defaultdict(
+            lambda: collections.deque(maxlen=EXPLANATION_LATENCY_WINDOW)
+        )
+        # LFU cache of explanations: key -> explanation, plus hit counts
+        self._explanation_cache: Dict[Tuple, str] = {}
+        self._explanation_hits: Dict[Tuple, int] = {}
+        # On-disk cache of whole deconstructions (only used with a Claude client)
+        self._deconstruction_cache = FileCache(
+            default_cache_path("DECONSTRUCTION_CACHE_DIR", "deconstructions"),
+            ".json",
+            max_bytes=DECONSTRUCTION_CACHE_MAX_BYTES,
+        )
+
+    def _roman_numeral(self, chord: Chord, key_semitone: int, is_major: bool) -> str:
+        """Roman numeral for a chord, given the key already resolved to a semitone"""
+        interval = (NOTE_TO_SEMITONE.get(chord.root, 0) - key_semitone) % 12
+
+        # Scale degree with case already adjusted to the chord quality
+        numerals = ROMAN_NUMERAL_TABLES.get((is_major, chord.quality)) or ROMAN_NUMERAL_TABLES[(is_major, None)]
+
+        return numerals[interval] + _roman_suffix(chord.quality, chord.extensions & SYMBOL_MASK)
 
     def extract_skeleton(self, chords: List[Chord]) -> List[Chord]:
         """
         Remove all extensions, return basic triads.
         Strip down to root and quality only.
         """
-        skeleton = []
-        for chord in chords:
-            new_chord = chord.copy()
-            new_chord.remove_extensions()
-            skeleton.append(new_chord)
-        return skeleton
+        return [Chord(c.root, c.quality, 0, c.original_symbol) for c in chords]
 
     def identify_layers(self, original: List[Chord]) -> Dict[str, List[int]]:
         """
         Find what modifications exist in the progression.
         Returns dict mapping layer types to chord indices where they appear.
         """
-        layers = {
-            "sevenths": [],      # maj7, min7, dom7, dim7
-            "suspensions": [],   # sus2, sus4
-            "extensions": [],    # add9, add11, add13
-            "alterations": [],   # b5, #5, b9, #9, #11, b13
+        return {
+            layer_type: [i for i, chord in enumerate(original) if chord.extensions & mask]
+            for layer_type, mask in LAYER_MASKS.items()
         }
 
-        for i, chord in enumerate(original):
-            if chord.has_any_seventh():
-                layers["sevenths"].append(i)
-
-            if chord.has_any_suspension():
-                layers["suspensions"].append(i)
-
-            if chord.has_any_extension():
-                layers["extensions"].append(i)
-
-            if chord.has_any_alteration():
-                layers["alterations"].append(i)
-
-        return layers
-
-    def add_sevenths(self, base_chords: List[Chord], original: List[Chord], indices: List[int]) -> List[Chord]:
-        """Add 7th extensions from original chords to specified indices"""
-        result = [c.copy() for c in base_chords]
-        for idx in indices:
-            if 0 <= idx < len(result) and idx < len(original):
-                # Copy the specific 7th type from original
-                for seventh_type in ['maj7', 'min7', 'dom7', 'dim7']:
-                    if original[idx].extensions.get(seventh_type):
-                        result[idx].extensions[seventh_type] = True
-                        break
-        return result
-
-    def add_suspensions(self, base_chords: List[Chord], original: List[Chord], indices: List[int]) -> List[Chord]:
-        """Add suspension extensions from original chords"""
-        result = [c.copy() for c in base_chords]
-        for idx in indices:
-            if 0 <= idx < len(result) and idx < len(original):
-                if original[idx].extensions.get('sus4'):
-                    result[idx].extensions['sus4'] = True
-                if original[idx].extensions.get('sus2'):
-                    result[idx].extensions['sus2'] = True
-        return result
-
-    def add_extensions(self, base_chords: List[Chord], original: List[Chord], indices: List[int]) -> List[Chord]:
-        """Add 9th/11th/13th extensions from original chords"""
-        result = [c.copy() for c in base_chords]
-        for idx in indices:
-            if 0 <= idx < len(result) and idx < len(original):
-                for ext in ['add9', 'add11', 'add13', 'add6']:
-                    if original[idx].extensions.get(ext):
-                        result[idx].extensions[ext] = True
-        return result
-
-    def add_alterations(self, base_chords: List[Chord], original: List[Chord], indices: List[int]) -> List[Chord]:
-        """Add chromatic alterations from original chords"""
-        result = [c.copy() for c in base_chords]
+    def _merge_extensions(self, base_chords: List[Chord], original: List[Chord], indices: List[int],
+                          mask: int) -> List[Chord]:
+        """
+        Carry the extension flags in `mask` from original chords into base_chords.
+        Only the first 7th type (maj7, min7, dom7, dim7 order) is carried.
+        Only chords that actually gain a flag are rebuilt; the rest are shared with base_chords.
+        """
+        result = list(base_chords)
         for idx in indices:
             if 0 <= idx < len(result) and idx < len(original):
-                for alt in ['b5', '#5', 'b9', '#9', '#11', 'b13']:
-                    if original[idx].extensions.get(alt):
-                        result[idx].extensions[alt] = True
+                added = original[idx].extensions & mask
+                sevenths = added & SEVENTH_MASK
+                if sevenths:
+                    # The 7th bits ascend in that order, so the lowest set bit is the first match
+                    added ^= sevenths ^ (sevenths & -sevenths)
+                chord = result[idx]
+                if added & ~chord.extensions:
+                    result[idx] = Chord(chord.root, chord.quality, chord.extensions | added, chord.original_symbol)
         return result
 
     def find_modified_indices(self, prev_chords: List[Chord], curr_chords: List[Chord]) -> List[int]:
-        """Find which chord indices changed between steps"""
-        modified = []
-        for i in range(min(len(prev_chords), len(curr_chords))):
-            if str(prev_chords[i]) != str(curr_chords[i]):
-                modified.append(i)
-        return modified
+        """
+        Find which chord indices changed between steps.
+        Compares root, quality and extension flags directly rather than
+        rendered symbols, so changes that don't show up in the symbol
+        (e.g. add6 or alterations) are still reported.
+        """
+        return [
+            i for i, (prev, curr) in enumerate(zip(prev_chords, curr_chords))
+            if (prev.root, prev.quality, prev.extensions) != (curr.root, curr.quality, curr.extensions)
+        ]
 
     def create_steps(
         self,
@@ -293,69 +395,191 @@ class ProgressionDeconstructor:
         Order: skeleton → 7ths → suspensions → extensions → alterations
         Returns list of step dicts with name, chords, layer_type, modified_indices, roman_numerals
         """
+        # Numerals are rendered once for the skeleton, then only for chords each layer changes
+        key_semitone = NOTE_TO_SEMITONE.get(key, 0)
+        is_major = mode == 'major'
+        numerals = [self._roman_numeral(c, key_semitone, is_major) for c in skeleton]
+
         steps = [{
             "name": "Skeleton",
             "chords": skeleton,
             "layer_type": "skeleton",
             "modified_indices": [],
-            "roman_numerals": self.format_roman_numerals(skeleton, key, mode),
+            "roman_numerals": " → ".join(numerals),
         }]
 
         current = skeleton
 
-        # Add 7ths if present
-        if layers["sevenths"]:
-            prev = current
-            current = self.add_sevenths(current, original, layers["sevenths"])
-            steps.append({
-                "name": "Add 7ths",
-                "chords": current,
-                "layer_type": "sevenths",
-                "modified_indices": self.find_modified_indices(prev, current),
-                "roman_numerals": self.format_roman_numerals(current, key, mode),
-            })
-
-        # Add suspensions if present
-        if layers["suspensions"]:
-            prev = current
-            current = self.add_suspensions(current, original, layers["suspensions"])
-            steps.append({
-                "name": "Add Suspensions",
-                "chords": current,
-                "layer_type": "suspensions",
-                "modified_indices": self.find_modified_indices(prev, current),
-                "roman_numerals": self.format_roman_numerals(current, key, mode),
-            })
-
-        # Add extensions if present
-        if layers["extensions"]:
-            prev = current
-            current = self.add_extensions(current, original, layers["extensions"])
-            steps.append({
-                "name": "Add Extensions",
-                "chords": current,
-                "layer_type": "extensions",
-                "modified_indices": self.find_modified_indices(prev, current),
-                "roman_numerals": self.format_roman_numerals(current, key, mode),
-            })
-
-        # Add alterations if present
-        if layers["alterations"]:
+        # Layer each modification on top of the previous step, in pedagogical order
+        layer_names = (
+            ("sevenths", "Add 7ths"),
+            ("suspensions", "Add Suspensions"),
+            ("extensions", "Add Extensions"),
+            ("alterations", "Complex Alterations"),
+        )
+        for layer_type, name in layer_names:
+            if not layers[layer_type]:
+                continue
             prev = current
-            current = self.add_alterations(current, original, layers["alterations"])
+            current = self._merge_extensions(current, original, layers[layer_type], LAYER_MASKS[layer_type])
+            modified_indices = self.find_modified_indices(prev, current)
+            for i in modified_indices:
+                numerals[i] = self._roman_numeral(current[i], key_semitone, is_major)
             steps.append({
-                "name": "Complex Alterations",
+                "name": name,
                 "chords": current,
-                "layer_type": "alterations",
-                "modified_indices": self.find_modified_indices(prev, current),
-                "roman_numerals": self.format_roman_numerals(current, key, mode),
+                "layer_type": layer_type,
+                "modified_indices": modified_indices,
+                "roman_numerals": " → ".join(numerals),
             })
 
         return steps[:6]  # Limit to 6 steps max
 
     def format_chord_list(self, chords: List[Chord]) -> str:
         """Format a chord list as a readable string"""
-        return " → ".join(str(c) for c in chords)
+        return " → ".join([c.to_symbol() for c in chords])
+
+    def _explanation_cache_key(self, step: Dict, previous_step: Optional[Dict], song_title: Optional[str],
+                               composer: Optional[str], key: Optional[str], mode: Optional[str]) -> Tuple:
+        """Everything an explanation prompt depends on; identical keys produce identical prompts"""
+        chord_list = step["chords"]
+        return (
+            step["layer_type"],
+            step["roman_numerals"],
+            previous_step["roman_numerals"] if previous_step else "basic triads",
+            tuple(str(chord_list[i]) for i in step.get("modified_indices", []) if i < len(chord_list)),
+            key, mode, song_title, composer,
+        )
+
+    def _cache_explanation(self, cache_key: Tuple, explanation: str) -> None:
+        """Store an explanation, evicting the least frequently used entry (oldest first on ties)"""
+        if len(self._explanation_cache) >= EXPLANATION_CACHE_SIZE:
+            evicted = min(self._explanation_hits, key=self._explanation_hits.get)
+            del self._explanation_cache[evicted], self._explanation_hits[evicted]
+        self._explanation_cache[cache_key] = explanation
+        self._explanation_hits[cache_key] = 0
+
+    def _prompt_intro(self, song_title: Optional[str], composer: Optional[str]) -> str:
+        """Opening line of the explanation prompt, framed by song/composer context"""
+        if song_title and composer:
+            context = f'analyzing "{song_title}" by {composer}'
+        elif song_title:
+            context = f'analyzing "{song_title}"'
+        elif composer:
+            context = f"studying {composer}'s harmonic style"
+        else:
+            context = "teaching chord progression construction"
+        return (f"You're Leonard Bernstein at the piano, {context}, showing someone how harmony "
+                f"builds from simple bones to something that moves the soul.")
+
+    def _prompt_guidance(self, song_title: Optional[str], composer: Optional[str]) -> str:
+        """What to cover and the style rules, plus song/composer specific rules"""
+        guidance = EXPLANATION_GUIDANCE
+        if song_title:
+            guidance += f'\n- Reference "{song_title}" naturally'
+        if composer:
+            guidance += f"\n- Connect to {composer}'s compositional style"
+        return guidance
+
+    def _describe_step(self, step: Dict, previous_step: Optional[Dict], key: Optional[str],
+                       mode: Optional[str]) -> str:
+        """Describe the change a step makes, for use in an explanation prompt"""
+        layer_type = step["layer_type"]
+
+        # Build the progression strings
+        current_progression = step["roman_numerals"]
+        previous_progression = previous_step["roman_numerals"] if previous_step else "basic triads"
+
+        # Identify what specifically changed
+        modified_count = len(step.get("modified_indices", []))
+        chord_list = step["chords"]
+        modified_chords = [str(chord_list[i]) for i in step.get("modified_indices", []) if i < len(chord_list)]
+
+        return f"""FROM: {previous_progression}
+TO: {current_progression} ({step["name"]})
+KEY: {key} {mode}
+
+WHAT CHANGED: {modified_count} chord(s) modified: {', '.join(modified_chords) if modified_chords else 'establishing foundation'}
+LAYER: {layer_type}
+HINT: {FALLBACK_BY_LAYER.get(layer_type, '')}"""
+
+    def _sentence_cut(self, text: str) -> Optional[int]:
+        """End of the MAX_EXPLANATION_SENTENCES-th complete sentence, or None if text has fewer"""
+        sentence_ends = [m.end() for m in SENTENCE_END_RE.finditer(text)]
+        if len(sentence_ends) >= MAX_EXPLANATION_SENTENCES:
+            return sentence_ends[MAX_EXPLANATION_SENTENCES - 1]
+        return None
+
+    def _limit_sentences(self, text: str) -> str:
+        """Cut text after MAX_EXPLANATION_SENTENCES complete sentences"""
+        cut = self._sentence_cut(text)
+        return (text if cut is None else text[:cut]).strip()
+
+    async def _call_claude(self, kind: str, call: Callable[[Callable[[], None]], Awaitable[T]]) -> T:
+        """
+        Run a streamed Claude call with a concurrency slot, a timeout and a hedge.
+
+        `call` is passed a callback to invoke whenever text arrives. If the call
+        has produced no text twice the recent median time-to-first-text for this
+        kind of call after it got its slot, and a slot is free, an identical
+        second call is started; once text is streaming a duplicate can't win, so
+        none is started. The first attempt to succeed is returned and the other
+        is cancelled; if one fails, the other may still succeed.
+
+        Each attempt gets EXPLANATION_TIMEOUT seconds once it holds a slot, and
+        waits at most EXPLANATION_QUEUE_TIMEOUT seconds for one (TimeoutError).
+        """
+        first_text_times = self._first_text_times[kind]
+        hedge_after = 2 * statistics.median(first_text_times) if first_text_times else EXPLANATION_HEDGE_AFTER
+
+        async def attempt(slot_taken: asyncio.Event, responding: asyncio.Event) -> T:
+            async with asyncio.timeout(EXPLANATION_QUEUE_TIMEOUT):
+                await self._explanation_slots.acquire()
+            try:
+                slot_taken.set()
+                started = time.monotonic()
+
+                def on_text() -> None:
+                    if not responding.is_set():
+                        first_text_times.append(time.monotonic() - started)
+                        responding.set()
+
+                async with asyncio.timeout(EXPLANATION_TIMEOUT):
+                    return await call(on_text)
+            finally:
+                self._explanation_slots.release()
+
+        slot_taken, responding = asyncio.Event(), asyncio.Event()
+        primary = asyncio.create_task(attempt(slot_taken, responding))
+        tasks = {primary}
+        try:
+            # Time queued behind other calls is not API slowness, so the
+            # hedge clock only starts once the primary holds a slot
+            await self._wait_for_event(slot_taken, primary)
+            await self._wait_for_event(responding, primary, timeout=hedge_after)
+            if not primary.done() and not responding.is_set() and not self._explanation_slots.locked():
+                tasks.add(asyncio.create_task(attempt(asyncio.Event(), asyncio.Event())))
+
+            while True:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                if not tasks:
+                    raise done.pop().exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    async def _wait_for_event(event: asyncio.Event, task: asyncio.Task, timeout: Optional[float] = None) -> None:
+        """Wait until event is set or task finishes, or timeout seconds pass"""
+        waiter = asyncio.create_task(event.wait())
+        try:
+            await asyncio.wait({waiter, task}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiter.cancel()
 
     async def generate_explanation(
         self,
@@ -384,70 +608,187 @@ class ProgressionDeconstructor:
         """
         if not self.client:
             # Return fallback from LAYER_EFFECTS
-            layer_info = LAYER_EFFECTS.get(step["layer_type"], {})
-            return layer_info.get("effect", "Explanation unavailable - API key not configured")
-
-        layer_type = step["layer_type"]
-        layer_info = LAYER_EFFECTS.get(layer_type, {})
+            return FALLBACK_BY_LAYER.get(step["layer_type"], "Explanation unavailable - API key not configured")
 
-        # Build the progression strings
-        current_progression = step["roman_numerals"]
-        previous_progression = previous_step["roman_numerals"] if previous_step else "basic triads"
+        fallback = FALLBACK_BY_LAYER.get(step["layer_type"])
 
-        # Identify what specifically changed
-        modified_count = len(step.get("modified_indices", []))
-        chord_list = step["chords"]
-        modified_chords = [str(chord_list[i]) for i in step.get("modified_indices", []) if i < len(chord_list)]
+        # Identical inputs always produce the same prompt, so reuse earlier answers
+        cache_key = self._explanation_cache_key(step, previous_step, song_title, composer, key, mode)
+        cached = self._explanation_cache.get(cache_key)
+        if cached is not None:
+            self._explanation_hits[cache_key] += 1
+            return cached
 
         # Build context-aware prompt
-        context = ""
-        if song_title and composer:
-            context = f'analyzing "{song_title}" by {composer}'
-        elif song_title:
-            context = f'analyzing "{song_title}"'
-        elif composer:
-            context = f"studying {composer}'s harmonic style"
-        else:
-            context = "teaching chord progression construction"
-
-        prompt = f"""You're Leonard Bernstein at the piano, {context}, showing someone how harmony builds from simple bones to something that moves the soul.
+        prompt = (
+            f"{self._prompt_intro(song_title, composer)}\n\n"
+            f"{self._describe_step(step, previous_step, key, mode)}\n\n"
+            f"In 2-3 sentences, tell us:\n{self._prompt_guidance(song_title, composer)}"
+        )
+
+        async def stream_explanation(on_text: Callable[[], None]) -> str:
+            # Stream the response so we can stop as soon as enough sentences are in
+            explanation = ""
+            async with self.client.messages.stream(
+                model=CLAUDE_MODEL,
+                max_tokens=250,
+                messages=[{"role": "user", "content": prompt}],
+            ) as stream:
+                async for text in stream.text_stream:
+                    on_text()
+                    explanation += text
+                    cut = self._sentence_cut(explanation)
+                    if cut is not None:
+                        explanation = explanation[:cut]
+                        break
+            return explanation
 
-FROM: {previous_progression}
-TO: {current_progression} ({step["name"]})
-KEY: {key} {mode}
+        try:
+            explanation = (await self._call_claude("single", stream_explanation)).strip()
+            if not explanation:
+                return fallback or "Unable to generate explanation"
 
-WHAT CHANGED: {modified_count} chord(s) modified: {', '.join(modified_chords) if modified_chords else 'establishing foundation'}
-LAYER: {layer_type}
-HINT: {layer_info.get('effect', '')}
+            self._cache_explanation(cache_key, explanation)
+            return explanation
+        except Exception as e:
+            # Fallback to static description
+            return fallback or f"Explanation generation failed: {str(e)}"
 
-In 2-3 sentences, tell us:
-- What this change DOES to the sound (be vivid—"floating", "aching", "bright")
-- WHY a composer reaches for this tool at this moment
-- How it serves the emotional arc
+    async def generate_explanations(
+        self,
+        steps: List[Dict],
+        song_title: Optional[str] = None,
+        composer: Optional[str] = None,
+        key: Optional[str] = None,
+        mode: Optional[str] = None,
+        on_explanation: Optional[Callable[[int, str], Awaitable[None]]] = None
+    ) -> List[str]:
+        """
+        Generate explanations for every step of a deconstruction.
 
-RULES:
-- Talk about what the ear hears, not just what the theory says
-- If it affects how the voices move, mention it—but explain why that matters
-- Wit is welcome; sentimentality is not
-- No emojis, no exclamation points, no filler
-- Exactly 2-3 sentences"""
+        Cached steps are answered from the cache. If more than one step is left,
+        they are explained together in a single streamed Claude request that
+        returns a JSON object keyed by step index, instead of one round-trip per
+        step; each entry is reported as soon as it has streamed in. Steps missing
+        from that response (or all of them, if the request fails) fall back to
+        the static LAYER_EFFECTS description.
 
-        if song_title:
-            prompt += f'\n- Reference "{song_title}" naturally'
-        if composer:
-            prompt += f"\n- Connect to {composer}'s compositional style"
+        Args:
+            steps: Step dicts from create_steps, in order
+            song_title: Optional song title for contextual explanations
+            composer: Optional composer/artist name for contextual explanations
+            key: Musical key (e.g., "C", "G")
+            mode: Musical mode (e.g., "major", "minor")
+            on_explanation: Optional async callback, awaited with (step index,
+                explanation) as each explanation becomes available, in any order
 
-        try:
-            message = self.client.messages.create(
-                model="claude-sonnet-4-20250514",  # Use Sonnet for speed
-                max_tokens=250,
-                messages=[{"role": "user", "content": prompt}],
+        Returns:
+            One explanation per step, in step order
+        """
+        previous_steps = [steps[i - 1] if i else None for i in range(len(steps))]
+        fallbacks = [FALLBACK_BY_LAYER.get(step["layer_type"]) for step in steps]
+        if not self.client:
+            explanations = [fallback or "Explanation unavailable - API key not configured" for fallback in fallbacks]
+            if on_explanation is not None:
+                for i, explanation in enumerate(explanations):
+                    await on_explanation(i, explanation)
+            return explanations
+
+        cache_keys = [
+            self._explanation_cache_key(step, previous_step, song_title, composer, key, mode)
+            for step, previous_step in zip(steps, previous_steps)
+        ]
+        explanations = [self._explanation_cache.get(cache_key) for cache_key in cache_keys]
+        pending = []
+        for i, explanation in enumerate(explanations):
+            if explanation is None:
+                pending.append(i)
+            else:
+                self._explanation_hits[cache_keys[i]] += 1
+                if on_explanation is not None:
+                    await on_explanation(i, explanation)
+
+        if len(pending) == 1:
+            i = pending[0]
+            explanations[i] = await self.generate_explanation(
+                steps[i], previous_steps[i], song_title, composer, key, mode
+            )
+            if on_explanation is not None:
+                await on_explanation(i, explanations[i])
+        elif pending:
+            step_sections = "\n\n".join(
+                f'<step id="{i}">\n{self._describe_step(steps[i], previous_steps[i], key, mode)}\n</step>'
+                for i in pending
+            )
+            example = ", ".join(f'"{i}": "..."' for i in pending)
+            prompt = (
+                f"{self._prompt_intro(song_title, composer)}\n\n"
+                f"Here are the steps, in order:\n\n{step_sections}\n\n"
+                f"For each step, in 2-3 sentences, tell us:\n{self._prompt_guidance(song_title, composer)}\n\n"
+                f"Return only a JSON object mapping each step id to its explanation: {{{example}}}"
             )
 
-            return message.content[0].text if message.content else layer_info.get("effect", "Unable to generate explanation")
-        except Exception as e:
-            # Fallback to static description
-            return layer_info.get("effect", f"Explanation generation failed: {str(e)}")
+            pending_ids = set(pending)
+
+            async def accept(i: int, explanation: object) -> None:
+                # Keep the first usable answer per step (a hedged request may send it twice)
+                if i not in pending_ids or not isinstance(explanation, str):
+                    return
+                explanation = self._limit_sentences(explanation)
+                if explanation:
+                    pending_ids.discard(i)
+                    self._cache_explanation(cache_keys[i], explanation)
+                    explanations[i] = explanation
+                    if on_explanation is not None:
+                        await on_explanation(i, explanation)
+
+            async def stream_batch(on_text: Callable[[], None]) -> str:
+                response_text = ""
+                scanned = 0
+                async with self.client.messages.stream(
+                    model=CLAUDE_MODEL,
+                    max_tokens=250 * len(pending),
+                    temperature=0.0,
+                    messages=[{"role": "user", "content": prompt}],
+                ) as stream:
+                    async for text in stream.text_stream:
+                        on_text()
+                        response_text += text
+                        for entry in BATCH_ENTRY_RE.finditer(response_text, scanned):
+                            scanned = entry.end()
+                            try:
+                                await accept(int(entry.group(1)), json.loads(entry.group(2)))
+                            except ValueError:
+                                pass
+                return response_text
+
+            try:
+                response_text = await self._call_claude("batch", stream_batch)
+                json_match = JSON_OBJECT_RE.search(response_text)
+                batch = json.loads(json_match.group()) if json_match else {}
+                if not isinstance(batch, dict):
+                    batch = {}
+            except Exception as e:
+                batch = {}
+                fallbacks = [fallback or f"Explanation generation failed: {str(e)}" for fallback in fallbacks]
+
+            for i in pending:
+                await accept(i, batch.get(str(i)))
+                if i in pending_ids:
+                    explanations[i] = fallbacks[i] or "Unable to generate explanation"
+                    if on_explanation is not None:
+                        await on_explanation(i, explanations[i])
+
+        return explanations
+
+    def _deconstruction_cache_key(self, chords: List[Dict], key: str, mode: str,
+                                  song_title: Optional[str], composer: Optional[str]) -> str:
+        """Cache key for a deconstruction: a hash of all of its inputs"""
+        inputs = json.dumps(
+            [chords, key, mode, song_title, composer, CLAUDE_MODEL, DECONSTRUCTION_CACHE_VERSION],
+            sort_keys=True,
+        )
+        return hashlib.blake2b(inputs.encode(), digest_size=16).hexdigest()
 
     async def deconstruct(
         self,
@@ -455,7 +796,8 @@ RULES:
         key: str,
         mode: str,
         song_title: Optional[str] = None,
-        composer: Optional[str] = None
+        composer: Optional[str] = None,
+        on_step: Optional[Callable[[Dict], Awaitable[None]]] = None
     ) -> List[Dict]:
         """
         Main deconstruction method - breaks a progression into pedagogical steps.
@@ -466,6 +808,8 @@ RULES:
             mode: Musical mode (e.g., "major", "minor")
             song_title: Optional song title for richer, contextual descriptions
             composer: Optional composer/artist name for contextual descriptions
+            on_step: Optional async callback, awaited with each step dict once
+                its description is ready, in step order
 
         Returns:
             List of step dicts with:
@@ -477,6 +821,21 @@ RULES:
             - modifiedIndices: List[int]
             - romanNumerals: str
         """
+        # Whole deconstructions are deterministic given their inputs; reuse earlier results
+        cache_key = None
+        if self.client:
+            cache_key = self._deconstruction_cache_key(chords, key, mode, song_title, composer)
+            cached = await self._deconstruction_cache.get(cache_key)
+            try:
+                cached_steps = json.loads(cached) if cached is not None else None
+            except ValueError:
+                cached_steps = None
+            if cached_steps is not None:
+                if on_step is not None:
+                    for response_step in cached_steps:
+                        await on_step(response_step)
+                return cached_steps
+
         # Convert to internal Chord objects, preserving original symbol
         chord_objects = [
             Chord(
@@ -497,32 +856,46 @@ RULES:
         # Step 3: Create progression steps with metadata
         progression_steps = self.create_steps(skeleton, layers, chord_objects, key, mode)
 
-        # Step 4: Generate AI explanations for each step
-        result_steps = []
-        previous_step = None
-
-        for step_number, step in enumerate(progression_steps):
-            # Generate rich explanation with song context
-            description = await self.generate_explanation(
-                step=step,
-                previous_step=previous_step,
-                song_title=song_title,
-                composer=composer,
-                key=key,
-                mode=mode
-            )
-
-            # Build response step
-            result_steps.append({
+        # Build response steps; descriptions are filled in as they arrive
+        response_steps = [
+            {
                 "stepNumber": step_number,
                 "stepName": step["name"],
-                "description": description,
+                "description": None,
                 "chords": [c.to_dict() for c in step["chords"]],
                 "layerType": step["layer_type"],
                 "modifiedIndices": step["modified_indices"],
                 "romanNumerals": step["roman_numerals"],
-            })
+            }
+            for step_number, step in enumerate(progression_steps)
+        ]
+        next_step = 0
+
+        async def describe(i: int, description: str) -> None:
+            # Report every step whose description (and all earlier ones) is ready
+            nonlocal next_step
+            response_steps[i]["description"] = description
+            while next_step < len(response_steps) and response_steps[next_step]["description"] is not None:
+                if on_step is not None:
+                    await on_step(response_steps[next_step])
+                next_step += 1
+
+        # Step 4: Generate AI explanations for all steps in one batch.
+        # Plain triads deconstruct to the skeleton alone, which needs no Claude call.
+        if len(progression_steps) == 1:
+            descriptions = [FALLBACK_BY_LAYER["skeleton"]]
+            await describe(0, descriptions[0])
+        else:
+            descriptions = await self.generate_explanations(
+                progression_steps, song_title=song_title, composer=composer, key=key, mode=mode,
+                on_explanation=describe
+            )
 
-            previous_step = step
+        # Only cache complete results, not ones that fell back to static descriptions
+        if cache_key is not None and all(
+            description != FALLBACK_BY_LAYER.get(step["layer_type"])
+            for step, description in zip(progression_steps, descriptions)
+        ):
+            await self._deconstruction_cache.set(cache_key, json.dumps(response_steps).encode())
 
-        return result_steps
+        return response_steps
@@ -3,7 +3,8 @@ Emotional intent mapping to harmonic techniques.
 Maps keywords from user input to specific chord manipulation techniques.
 """
 
-from typing import List, Set
+from typing import Dict, FrozenSet, List, Set, Tuple
+import functools
 import re
 
 # Emotional mappings: keywords to harmonic techniques and composer examples
@@ -121,6 +122,15 @@ EMOTIONAL_MAPPINGS = {
 }
 
 
+# Shortest word treated as an abbreviation of a keyword ("melanch" -> "melancholic")
+MIN_KEYWORD_PREFIX = 4
+# Whole words of an intent, checked against those abbreviations
+WORD_RE = re.compile(r'\b\w+\b')
+
+# Number of distinct intents whose keywords and techniques are memoized
+INTENT_CACHE_SIZE = 1024
+
+
 class EmotionalMapper:
     """
     Maps emotional intent descriptions to harmonic techniques.
@@ -130,7 +140,37 @@ class EmotionalMapper:
     def __init__(self):
         self.mappings = EMOTIONAL_MAPPINGS
 
-    def extract_keywords(self, intent: str) -> Set[str]:
+        # One regex finds every keyword occurrence in a single pass. The lookahead
+        # lets matches overlap; longest-first alternation plus the "contained"
+        # table below also report keywords that sit inside a longer match.
+        alternation = "|".join(sorted(map(re.escape, self.mappings), key=len, reverse=True))
+        self._keyword_re = re.compile(f"(?=({alternation}))")
+        self._contained_keywords: Dict[str, FrozenSet[str]] = {
+            keyword: frozenset(other for other in self.mappings if other in keyword)
+            for keyword in self.mappings
+        }
+
+        # Keyword prefixes (at least MIN_KEYWORD_PREFIX long) -> keywords they abbreviate
+        prefixes: Dict[str, Set[str]] = {}
+        for keyword in self.mappings:
+            for end in range(MIN_KEYWORD_PREFIX, len(keyword)):
+                prefixes.setdefault(keyword[:end], set()).add(keyword)
+        self._keywords_by_prefix: Dict[str, FrozenSet[str]] = {
+            prefix: frozenset(keywords) for prefix, keywords in prefixes.items()
+        }
+
+        # Per-field index of each keyword's values, frozen once: field -> keyword -> values
+        self._values_by_keyword: Dict[str, Dict[str, FrozenSet[str]]] = {
+            field: {keyword: frozenset(mapping[field]) for keyword, mapping in self.mappings.items()}
+            for field in ("techniques", "composers", "avoid")
+        }
+
+        # The same intent is looked up several times per request (techniques,
+        # composers, avoid list), so memoize per instance, keyed by intent
+        self._keywords_for = functools.lru_cache(maxsize=INTENT_CACHE_SIZE)(self._scan_keywords)
+        self._field_for = functools.lru_cache(maxsize=INTENT_CACHE_SIZE)(self._collect_field)
+
+    def extract_keywords(self, intent: str) -> FrozenSet[str]:
         """
         Extract emotional keywords from user intent.
 
@@ -140,25 +180,31 @@ class EmotionalMapper:
         Returns:
             Set of recognized keywords
         """
+        return self._keywords_for(intent)
+
+    def _scan_keywords(self, intent: str) -> FrozenSet[str]:
+        """Uncached keyword extraction (see extract_keywords)"""
         intent_lower = intent.lower()
         keywords = set()
 
-        # Direct keyword matching
-        for keyword in self.mappings.keys():
-            if keyword in intent_lower:
-                keywords.add(keyword)
-
-        # Handle multi-word descriptions
+        # Direct keyword matching, anywhere in the text
         # "more ethereal" -> "ethereal"
         # "darker and more grounded" -> "dark", "grounded"
-        words = re.findall(r'\b\w+\b', intent_lower)
-        for word in words:
-            # Check for partial matches (e.g., "floating" matches "float")
-            for keyword in self.mappings.keys():
-                if word in keyword or keyword in word:
-                    keywords.add(keyword)
+        for match in self._keyword_re.finditer(intent_lower):
+            keywords |= self._contained_keywords[match.group(1)]
 
-        return keywords
+        # Words that abbreviate a keyword (e.g., "melanch" matches "melancholic").
+        # Short words are ignored so "a" or "so" don't match every keyword containing them.
+        for word in WORD_RE.findall(intent_lower):
+            keywords |= self._keywords_by_prefix.get(word, frozenset())
+
+        return frozenset(keywords)
+
+    def _collect_field(self, intent: str, field: str) -> Tuple[str, ...]:
+        """Combine one mapping field ("techniques", "composers", "avoid") across the intent's keywords"""
+        index = self._values_by_keyword[field]
+        keywords = self.extract_keywords(intent)
+        return tuple(frozenset().union(*(index[keyword] for keyword in keywords if keyword in index)))
 
     def get_techniques(self, intent: str) -> List[str]:
         """
@@ -170,20 +216,8 @@ class EmotionalMapper:
         Returns:
             List of technique names, sorted by relevance
         """
-        keywords = self.extract_keywords(intent)
-
-        # Combine techniques from all matching keywords
-        techniques = set()
-        for keyword in keywords:
-            if keyword in self.mappings:
-                techniques.update(self.mappings[keyword]["techniques"])
-
-        # If no keywords matched, return empty list
-        if not keywords:
-            return []
-
-        # Return unique techniques
-        return list(techniques)
+        # Combine techniques from all matching keywords (empty if none matched)
+        return list(self._field_for(intent, "techniques"))
 
     def get_composers(self, intent: str) -> List[str]:
         """
@@ -195,14 +229,7 @@ class EmotionalMapper:
         Returns:
             List of composer names
         """
-        keywords = self.extract_keywords(intent)
-        composers = set()
-
-        for keyword in keywords:
-            if keyword in self.mappings:
-                composers.update(self.mappings[keyword]["composers"])
-
-        return list(composers)
+        return list(self._field_for(intent, "composers"))
 
     def should_avoid(self, intent: str) -> List[str]:
         """
@@ -214,11 +241,4 @@ class EmotionalMapper:
         Returns:
             List of techniques to avoid
         """
-        keywords = self.extract_keywords(intent)
-        avoid = set()
-
-        for keyword in keywords:
-            if keyword in self.mappings:
-                avoid.update(self.mappings[keyword]["avoid"])
-
-        return list(avoid)
+        return list(self._field_for(intent, "avoid"))
@@ -0,0 +1,114 @@
+"""
+Small on-disk cache shared by the backend services.
+Each entry is one file in a directory, named by its key. Entries expire after a
+TTL, and the least recently used ones are dropped once the directory grows past
+a size limit. Disk errors never propagate; they only cost a cache miss.
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+# Cached entries are reused for this long
+CACHE_TTL = 30 * 24 * 60 * 60  # 30 days, in seconds
+# Expired and over-limit entries are swept at most this often per cache
+CACHE_TRIM_INTERVAL = 60  # seconds
+
+
+def default_cache_path(env_var: str, name: str) -> Path:
+    """Path from $env_var, or ~/.cache/neume/<name> if it isn't set"""
+    return Path(os.getenv(env_var) or Path.home() / ".cache" / "neume" / name)
+
+
+class FileCache:
+    """Directory of cached blobs with a TTL and an LRU size limit."""
+
+    def __init__(self, directory: Path, suffix: str, max_bytes: int, ttl: float = CACHE_TTL):
+        """
+        Initialize the cache.
+
+        Args:
+            directory: Directory holding the entries (created on first write).
+            suffix: File extension of entries, e.g. ".json".
+            max_bytes: Total size the entries are trimmed back to.
+            ttl: Seconds an entry stays valid after it was last written or read.
+        """
+        self.directory = Path(directory)
+        self.suffix = suffix
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._last_trim = 0.0
+
+    def path(self, key: str) -> Path:
+        """File holding the entry for key"""
+        return self.directory / f"{key}{self.suffix}"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Look up an entry without blocking the event loop, or None on a miss."""
+        return await asyncio.to_thread(self._load, key)
+
+    async def set(self, key: str, data: bytes) -> None:
+        """Store an entry without blocking the event loop."""
+        await asyncio.to_thread(self._store, key, data)
+
+    def _load(self, key: str) -> Optional[bytes]:
+        """Read an unexpired entry (blocking); touching it on a hit keeps it from LRU eviction"""
+        path = self.path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl:
+                return None
+            data = path.read_bytes()
+            os.utime(path)
+            return data
+        except OSError:
+            return None
+
+    def _store(self, key: str, data: bytes) -> None:
+        """Write an entry (blocking) via a unique temp file, so readers never see a partial one"""
+        tmp_path = None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{key}.", suffix=".tmp")
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_path, self.path(key))
+            tmp_path = None
+        except OSError:
+            pass
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+        if time.monotonic() - self._last_trim >= CACHE_TRIM_INTERVAL:
+            self._last_trim = time.monotonic()
+            self._trim()
+
+    def _trim(self) -> None:
+        """Delete expired entries, then the least recently used ones until under max_bytes"""
+        now = time.time()
+        entries = []
+        for path in self.directory.glob(f"*{self.suffix}"):
+            try:
+                stat = path.stat()
+                if now - stat.st_mtime > self.ttl:
+                    path.unlink()
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                pass
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
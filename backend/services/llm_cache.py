@@ -0,0 +1,112 @@
+"""
+Exact-match cache for Claude responses.
+Identical prompts (same model and sampling settings) are answered from memory
+or from a local SQLite file instead of another round-trip to the API.
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from services.file_cache import CACHE_TTL, default_cache_path
+
+# Maximum number of responses kept in memory in front of the SQLite file
+LLM_CACHE_MEMORY_SIZE = 1024
+
+
+class LLMCache:
+    """Two-tier (memory, then SQLite) cache of Claude text responses keyed by prompt."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            db_path: SQLite file to persist responses in. Defaults to $LLM_CACHE_PATH,
+                or ~/.cache/neume/llm_cache.sqlite3.
+        """
+        self.db_path = str(db_path or default_cache_path("LLM_CACHE_PATH", "llm_cache.sqlite3"))
+        self._memory: Dict[str, str] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_failed = False
+        # SQLite calls run in worker threads; one at a time on the shared connection
+        self._db_lock = threading.Lock()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the SQLite file on first use; None if it can't be used (memory-only then)."""
+        if self._db is None and not self._db_failed:
+            try:
+                os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+                self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+                )
+                self._db.commit()
+            except (OSError, sqlite3.Error) as e:
+                print(f"LLM cache disabled on disk: {str(e)}")
+                self._db = None
+                self._db_failed = True
+        return self._db
+
+    @staticmethod
+    def make_key(prompt: str, model: str, max_tokens: int, temperature: Optional[float] = None) -> str:
+        """SHA-256 of everything that determines the response."""
+        return hashlib.sha256(f"{model}\0{max_tokens}\0{temperature}\0{prompt}".encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Look up a cached response, or None on a miss."""
+        response = self._memory.get(key)
+        if response is not None:
+            return response
+
+        response = await asyncio.to_thread(self._load, key)
+        if response is not None:
+            self._remember(key, response)
+        return response
+
+    async def set(self, key: str, response: str) -> None:
+        """Store a response in memory and on disk."""
+        self._remember(key, response)
+        await asyncio.to_thread(self._store, key, response)
+
+    def _load(self, key: str) -> Optional[str]:
+        """Read an unexpired response from SQLite (blocking)."""
+        with self._db_lock:
+            db = self._connect()
+            if db is None:
+                return None
+            try:
+                row = db.execute(
+                    "SELECT response FROM responses WHERE key = ? AND created_at > ?",
+                    (key, time.time() - CACHE_TTL),
+                ).fetchone()
+            except sqlite3.Error:
+                return None
+        return row[0] if row else None
+
+    def _store(self, key: str, response: str) -> None:
+        """Write a response to SQLite (blocking); failures only cost a future cache miss."""
+        with self._db_lock:
+            db = self._connect()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, created_at) VALUES (?, ?, ?)",
+                    (key, response, time.time()),
+                )
+                db.commit()
+            except sqlite3.Error:
+                pass
+
+    def _remember(self, key: str, response: str) -> None:
+        """Keep a response in memory, evicting the oldest entry when full."""
+        if key not in self._memory and len(self._memory) >= LLM_CACHE_MEMORY_SIZE:
+            del self._memory[next(iter(self._memory))]
+        self._memory[key] = response
+
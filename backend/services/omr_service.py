@@ -1,6 +1,19 @@
-import subprocess
+import asyncio
+import hashlib
+import os
+import shutil
 import tempfile
 from pathlib import Path
+from typing import List, Optional
+
+from services.file_cache import FileCache, default_cache_path
+
+# Seconds Audiveris may run on one PDF before it is killed
+AUDIVERIS_TIMEOUT = 120
+# Least recently used scores are dropped once the cache grows past this size
+OMR_CACHE_MAX_BYTES = 1024 * 1024 * 1024  # 1 GB
+# Bump to invalidate cached scores when the recognition pipeline changes
+OMR_CACHE_VERSION = 1
 
 
 class OMRError(Exception):
@@ -11,19 +24,101 @@ class OMRError(Exception):
 class OMRService:
     """Service for optical music recognition using Audiveris."""
 
-    def __init__(self, audiveris_jar: str = "/app/audiveris.jar"):
+    def __init__(self, audiveris_jar: str = "/app/audiveris.jar", class_archive: Optional[str] = None):
         """
         Initialize the OMR service.
 
         Args:
             audiveris_jar: Path to the Audiveris JAR file.
+            class_archive: JVM class-data sharing archive for Audiveris. Defaults to
+                $AUDIVERIS_CDS_ARCHIVE, or ~/.cache/neume/audiveris.jsa. A hash of
+                the JAR and JDK is added to the file name, e.g. audiveris.<hash>.jsa.
         """
         self.audiveris_jar = audiveris_jar
+        self._score_cache = FileCache(
+            default_cache_path("OMR_CACHE_DIR", "omr"),
+            ".musicxml",
+            max_bytes=OMR_CACHE_MAX_BYTES,
+        )
+        # Identifies the installed Audiveris build, so an upgrade in place
+        # (same path, new JAR) doesn't reuse scores recognized by the old one
+        try:
+            jar_stat = os.stat(audiveris_jar)
+            self._jar_fingerprint = f"{audiveris_jar}\0{jar_stat.st_size}\0{jar_stat.st_mtime_ns}"
+        except OSError:
+            self._jar_fingerprint = audiveris_jar
+
+        # A class archive only matches the JAR and JDK it was dumped from, so
+        # name it after both; upgrading either then dumps a fresh archive
+        java = shutil.which("java")
+        try:
+            java = os.path.realpath(java)
+            java_stat = os.stat(java)
+            java_fingerprint = f"{java}\0{java_stat.st_size}\0{java_stat.st_mtime_ns}"
+        except (OSError, TypeError):
+            java_fingerprint = str(java)
+        archive_hash = hashlib.blake2b(
+            f"{self._jar_fingerprint}\0{java_fingerprint}".encode(), digest_size=8
+        ).hexdigest()
+        archive_base = Path(
+            class_archive or os.getenv("AUDIVERIS_CDS_ARCHIVE") or
+            Path.home() / ".cache" / "neume" / "audiveris.jsa"
+        )
+        self._archive_glob = f"{archive_base.stem}.*{archive_base.suffix}"
+        self.class_archive = archive_base.with_name(
+            f"{archive_base.stem}.{archive_hash}{archive_base.suffix}"
+        )
+
+    def _java_options(self, dump_path: Path) -> List[str]:
+        """
+        JVM flags that skip most of Audiveris' class loading on startup.
+
+        The first run dumps the loaded classes to dump_path; later runs map the
+        archive instead of loading and verifying those classes from the JAR again.
+        """
+        if self.class_archive.exists():
+            return [f"-XX:SharedArchiveFile={self.class_archive}"]
+        try:
+            self.class_archive.parent.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            return []
+        return [f"-XX:ArchiveClassesAtExit={dump_path}"]
+
+    def _install_class_archive(self, dump_path: Path) -> None:
+        """Move a freshly dumped archive into place (first writer wins) and drop outdated ones."""
+        if not dump_path.exists():
+            return
+        try:
+            if self.class_archive.exists():
+                dump_path.unlink()
+                return
+            os.replace(dump_path, self.class_archive)
+            for archive in self.class_archive.parent.glob(self._archive_glob):
+                if archive != self.class_archive:
+                    archive.unlink()
+        except OSError:
+            pass
+
+    def _cache_key(self, pdf_bytes: bytes) -> str:
+        """Cache key for a PDF: a hash of its bytes and the Audiveris build"""
+        digest = hashlib.blake2b(
+            f"{OMR_CACHE_VERSION}\0{self._jar_fingerprint}\0".encode(), digest_size=16
+        )
+        digest.update(pdf_bytes)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _find_musicxml(directory: Path) -> List[Path]:
+        """MusicXML files Audiveris exported into a directory"""
+        return list(directory.glob("*.xml")) + list(directory.glob("*.musicxml"))
 
     async def process_pdf(self, pdf_bytes: bytes) -> bytes:
         """
         Process a PDF file and extract music notation to MusicXML format.
 
+        Results are cached on disk by the PDF's content, so uploading the same
+        score again skips Audiveris entirely.
+
         Args:
             pdf_bytes: Raw bytes of the PDF file to process.
 
@@ -33,38 +128,55 @@ class OMRService:
         Raises:
             OMRError: If processing fails or no music notation is detected.
         """
+        cache_key = self._cache_key(pdf_bytes)
+        cached = await self._score_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        musicxml = await self._run_audiveris(pdf_bytes)
+        await self._score_cache.set(cache_key, musicxml)
+        return musicxml
+
+    async def _run_audiveris(self, pdf_bytes: bytes) -> bytes:
+        """Run Audiveris on a PDF and return the MusicXML it exports"""
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_path = Path(temp_dir)
 
             # Write PDF to temporary file
             pdf_input = temp_path / "input.pdf"
             try:
-                pdf_input.write_bytes(pdf_bytes)
+                await asyncio.to_thread(pdf_input.write_bytes, pdf_bytes)
             except IOError as e:
                 raise OMRError(f"Failed to write PDF file: {str(e)}")
 
-            # Run Audiveris
+            # Run Audiveris without blocking the event loop
+            process = None
+            archive_dump = self.class_archive.with_name(
+                f"{self.class_archive.name}.{os.getpid()}.{temp_path.name}.tmp"
+            )
             try:
-                result = subprocess.run(
-                    [
-                        "java",
-                        "-jar",
-                        self.audiveris_jar,
-                        "-batch",
-                        "-export",
-                        "-output",
-                        str(temp_path),
-                        str(pdf_input),
-                    ],
-                    capture_output=True,
-                    text=True,
-                    timeout=120,
+                java_options = await asyncio.to_thread(self._java_options, archive_dump)
+                process = await asyncio.create_subprocess_exec(
+                    "java",
+                    *java_options,
+                    "-jar",
+                    self.audiveris_jar,
+                    "-batch",
+                    "-export",
+                    "-output",
+                    str(temp_path),
+                    str(pdf_input),
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+                stdout_bytes, stderr_bytes = await asyncio.wait_for(
+                    process.communicate(), timeout=AUDIVERIS_TIMEOUT
                 )
 
-                if result.returncode != 0:
-                    stderr = result.stderr.strip()
+                if process.returncode != 0:
+                    stderr = stderr_bytes.decode(errors="replace").strip()
                     if not stderr:
-                        stderr = result.stdout.strip()
+                        stderr = stdout_bytes.decode(errors="replace").strip()
 
                     # Provide user-friendly error messages
                     if "no sheet" in stderr.lower() or "no page" in stderr.lower():
@@ -76,7 +188,7 @@ class OMRService:
                     else:
                         raise OMRError(f"Music recognition failed: {stderr}")
 
-            except subprocess.TimeoutExpired:
+            except asyncio.TimeoutError:
                 raise OMRError(
                     "Music recognition timed out (processing took too long). "
                     "Try with a smaller or simpler PDF."
@@ -86,13 +198,22 @@ class OMRService:
                     f"Audiveris not found at {self.audiveris_jar}. "
                     "Please ensure Audiveris is properly installed."
                 )
+            except OMRError:
+                raise
             except Exception as e:
                 raise OMRError(f"Unexpected error during music recognition: {str(e)}")
+            finally:
+                # Timed out or cancelled: stop Audiveris before its temp directory is removed
+                if process is not None and process.returncode is None:
+                    try:
+                        process.kill()
+                    except ProcessLookupError:
+                        pass
+                    await process.wait()
+                await asyncio.to_thread(self._install_class_archive, archive_dump)
 
             # Look for generated MusicXML file
-            musicxml_files = list(temp_path.glob("*.xml")) + list(
-                temp_path.glob("*.musicxml")
-            )
+            musicxml_files = await asyncio.to_thread(self._find_musicxml, temp_path)
 
             if not musicxml_files:
                 raise OMRError(
@@ -104,6 +225,6 @@ class OMRService:
             musicxml_file = musicxml_files[0]
 
             try:
-                return musicxml_file.read_bytes()
+                return await asyncio.to_thread(musicxml_file.read_bytes)
             except IOError as e:
                 raise OMRError(f"Failed to read generated music file: {str(e)}")
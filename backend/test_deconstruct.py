@@ -1,14 +1,10 @@
 #!/usr/bin/env python3
 """
 Quick test script to verify the deconstruction endpoint works
-Run this from the project root after starting the backend
+Run this from the backend directory: python3 test_deconstruct.py
 """
 import asyncio
 import sys
-import os
-
-# Add backend to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
 
 from services.deconstructor import ProgressionDeconstructor
 